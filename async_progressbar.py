@@ -3,25 +3,234 @@ from __future__ import annotations
 import random
 import sys
 import asyncio
+import contextlib
+import contextvars
+import functools
+import io
+import os
 import shutil
+import signal
+import threading
 import time
-from typing import Literal
+import weakref
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Generator, Iterator
+from types import FrameType
+from typing import TYPE_CHECKING, Callable, Literal, TextIO
+
+if TYPE_CHECKING:
+    from ipywidgets import HBox, IntProgress, Label
 
 SAVE_CURSOR_POSITION = "\0337"
 RESTORE_CURSOR_POSITION = "\0338"
 MOVE_CURSOR_TO_LINE_START = "\r"
 CLEAR_LINE_FROM_CURSOR_TO_END = "\033[K"
+# Weight of the newest sample in the moving average of the rate
+RATE_SMOOTHING = 0.1
+# Minimum time in seconds between two widget syncs to the notebook frontend
+WIDGET_SYNC_INTERVAL = 0.05
 
 
+@functools.lru_cache(maxsize=128)
 def move_cursor_up_lines(n: int) -> str:
     return f"\033[{n}A"
 
 
+@functools.lru_cache(maxsize=128)
 def move_cursor_down_lines(n: int) -> str:
     return f"\033[{n}B"
 
 
+class _FrameHold:
+    """Frames queued by one `hold_frames` block."""
+
+    __slots__ = ("frames", "open")
+
+    def __init__(self) -> None:
+        self.frames: list[bytes] = []
+        self.open: bool = True
+
+
+# Per task and per thread, so one caller's block never delays another's frames
+_frame_hold: contextvars.ContextVar[_FrameHold | None] = contextvars.ContextVar(
+    "_frame_hold", default=None
+)
+# The stream write_frame last saw as sys.stdout and its descriptor; the stream
+# is held weakly, so a stdout that has since been replaced isn't kept alive
+_stdout_fd: tuple[weakref.ref[TextIO] | None, int] = (None, -1)
+
+
+@contextlib.contextmanager
+def hold_frames() -> Iterator[None]:
+    """
+    Collect the frames written inside the block and write them all at once.
+
+    Updating several bars inside one block turns their frames into a single
+    write and flush. Nested blocks join the outermost one. Only frames drawn
+    by the current task or thread are held; other tasks keep writing directly.
+    """
+    hold = _frame_hold.get()
+    if hold is not None and hold.open:
+        yield
+        return
+    hold = _FrameHold()
+    token = _frame_hold.set(hold)
+    try:
+        yield
+    finally:
+        # Tasks started inside the block inherit the hold; closing it makes
+        # them write directly once the block is over
+        hold.open = False
+        _frame_hold.reset(token)
+        if hold.frames:
+            write_frame(b"".join(hold.frames))
+
+
+def write_frame(frame: bytes) -> None:
+    """Write a complete UTF-8 encoded frame to stdout and flush it.
+
+    If stdout is a UTF-8 stream over a plain file descriptor, the frame goes
+    straight to the descriptor with os.write, skipping both io layers.
+    Inside `hold_frames` the frame is queued instead.
+    """
+    global _stdout_fd
+    hold = _frame_hold.get()
+    if hold is not None and hold.open:
+        hold.frames.append(frame)
+        return
+    stdout = sys.stdout
+    seen = _stdout_fd[0]
+    if seen is None or seen() is not stdout:
+        try:
+            _stdout_fd = (weakref.ref(stdout), _utf8_fileno(stdout))
+        except TypeError:
+            # Streams without weakref support are simply looked up every time
+            _stdout_fd = (None, _utf8_fileno(stdout))
+    fd = _stdout_fd[1]
+    if fd >= 0:
+        view = memoryview(frame)
+        try:
+            # Push out any text the user printed so the frame lands after it
+            stdout.flush()
+            while view:
+                view = view[os.write(fd, view) :]
+            return
+        except BlockingIOError:
+            # A non-blocking stdout is full; let the buffered layer queue the rest
+            frame = bytes(view)
+    buffer = getattr(stdout, "buffer", None)
+    try:
+        if fd < 0:
+            stdout.flush()
+        utf8 = stdout.encoding in ("utf-8", "utf8")
+        if utf8 and isinstance(buffer, io.BufferedIOBase):
+            buffer.write(frame)
+            buffer.flush()
+        else:
+            stdout.write(frame.decode("utf-8"))
+            stdout.flush()
+    except BlockingIOError:
+        # Whatever didn't fit stays buffered and goes out with the next frame
+        pass
+
+
+def _utf8_fileno(stream: object) -> int:
+    """File descriptor behind a UTF-8 text stream, or -1 if frames can't use it."""
+    if getattr(stream, "encoding", None) not in ("utf-8", "utf8"):
+        return -1
+    # Only a plain FileIO passes bytes through untouched; the Windows console
+    # reports UTF-8 but transcodes to UTF-16, so raw UTF-8 on its handle garbles
+    buffer = getattr(stream, "buffer", None)
+    # Unbuffered streams (python -u) have the raw file as their buffer
+    raw = getattr(buffer, "raw", buffer)
+    if not isinstance(raw, io.FileIO):
+        return -1
+    try:
+        return raw.fileno()
+    except (OSError, ValueError):
+        return -1
+
+
+_terminal_size: os.terminal_size | None = None
+
+
+def _forget_terminal_size(_signum: int, _frame: FrameType | None) -> None:
+    global _terminal_size
+    _terminal_size = None
+
+
+def _stdout_is_terminal() -> bool:
+    # shutil.get_terminal_size() queries sys.__stdout__, so check the same stream
+    try:
+        return sys.__stdout__ is not None and sys.__stdout__.isatty()
+    except ValueError:
+        return False
+
+
+def get_terminal_size() -> os.terminal_size:
+    """Return the terminal size, querying the terminal again only after a resize."""
+    global _terminal_size
+    if _terminal_size is not None:
+        return _terminal_size
+    size = shutil.get_terminal_size()
+    if not _stdout_is_terminal():
+        # Pipes and files never resize, so the fallback size is final
+        _terminal_size = size
+        return size
+    # Otherwise only cache when SIGWINCH tells us about resizes
+    sigwinch: signal.Signals | None = getattr(signal, "SIGWINCH", None)
+    if sigwinch is None:
+        return size
+    handler: Callable[[int, FrameType | None], object] | int | None = (
+        signal.getsignal(sigwinch)
+    )
+    if handler is not _forget_terminal_size:
+        if handler != signal.SIG_DFL:
+            # Don't take over a handler installed by someone else
+            return size
+        try:
+            signal.signal(sigwinch, _forget_terminal_size)
+        except ValueError:
+            # Signal handlers can only be installed from the main thread
+            return size
+    _terminal_size = size
+    return size
+
+
+_ipywidgets: (
+    tuple[type[IntProgress], type[Label], type[HBox], Callable[..., object]] | None
+) = None
+
+
+def load_ipywidgets() -> tuple[
+    type[IntProgress], type[Label], type[HBox], Callable[..., object]
+]:
+    """Import the notebook widget classes on first use and cache them."""
+    global _ipywidgets
+    if _ipywidgets is None:
+        # We keep ipywidgets and ipython imports here to
+        # allow usage of the library without them
+        from ipywidgets import IntProgress, Label, HBox
+        from IPython.display import display
+
+        _ipywidgets = (IntProgress, Label, HBox, display)
+    return _ipywidgets
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_whole_seconds(seconds: int) -> str:
+    minutes, secs = divmod(seconds, 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+@functools.lru_cache(maxsize=1)
 def use_ipywidgets_progressbar() -> bool:
+    """
+    Whether we run inside a Jupyter kernel that can display widgets.
+
+    The answer can't change within a process, so it is computed once; call
+    `use_ipywidgets_progressbar.cache_clear()` to detect again.
+    """
     try:
         from IPython.core.getipython import get_ipython
 
@@ -34,7 +243,37 @@ def use_ipywidgets_progressbar() -> bool:
         return False
 
 
-class BaseProgressBar:
+class _Done:
+    """An awaitable that completes immediately without suspending."""
+
+    __slots__ = ()
+
+    def __await__(self) -> Generator[None, None, None]:
+        yield from ()
+
+
+_DONE = _Done()
+
+
+class BaseProgressBar(ABC):
+    __slots__ = (
+        "total",
+        "leave",
+        "prefix",
+        "suffix",
+        "progress",
+        "_last_update_time",
+        "_minimum_interval",
+        "_last_update_progress",
+        "_rate",
+        "_start_time",
+        "_next_update_deadline",
+        "_finished",
+        "_check_every",
+        "_progress_since_check",
+        "unit",
+    )
+
     def __init__(
         self,
         total: int,
@@ -44,7 +283,7 @@ class BaseProgressBar:
         minimum_interval: float = 0.1,
         unit: Literal["s", "min"] = "s",
     ):
-        self.total: float = total
+        self.total: int = total
         self.leave: bool = leave
         self.prefix: str = prefix
         self.suffix: str = suffix
@@ -54,35 +293,88 @@ class BaseProgressBar:
         self._last_update_progress: int = 0
         self._rate: float = 0.0  # internal: items / second
         self._start_time: float | None = None
+        self._next_update_deadline: float = 0.0
+        self._finished: bool = False
+        self._check_every: int = max(1, total // 1000)
+        self._progress_since_check: int = 0
         self.unit: Literal["s", "min"] = unit
 
-    async def update(self, progress: int = 1):
-        "Update the progress bar if the minimum interval time has passed."
-        # Reserve lines on first update call
-        if not TerminalProgressBar.lines_reserved:
-            TerminalProgressBar.reserve_lines()
+    def tick(self, progress: int = 1) -> bool:
+        """
+        Advance the progress without drawing.
 
+        Returns True when a redraw is due, i.e. the minimum interval has passed
+        or the bar is complete. Synchronous code can count with `tick` and
+        leave drawing to `redraw`.
+        """
         self.progress += progress
-        now = time.time()
+        if self.progress >= self.total:
+            return True
+        # Only look at the clock once every `_check_every` items
+        self._progress_since_check += progress
+        if self._progress_since_check < self._check_every:
+            return False
+        self._progress_since_check = 0
+        return time.monotonic() >= self._next_update_deadline
+
+    def update(self, progress: int = 1) -> Awaitable[None]:
+        """
+        Update the progress bar if the minimum interval time has passed.
+
+        Drawing never needs to wait, so this is a plain method that draws
+        inline. It returns an already-complete awaitable so that existing
+        `await bar.update()` calls keep working.
+        """
+        if self.tick(progress):
+            self.redraw()
+        return _DONE
+
+    async def aupdate(self, progress: int = 1) -> None:
+        """Coroutine form of `update`, for `create_task`, `gather` and friends."""
+        if self.tick(progress):
+            self.redraw()
+
+    def redraw(self) -> None:
+        """Draw the current progress now, finishing the bar if it is complete."""
+        # Once the final frame is out, overshooting updates only count
+        if self._finished:
+            return
+
+        now = time.monotonic()
+
         if self._start_time is None:
             self._start_time = now
+        else:
+            elapsed = now - self._last_update_time
+            if elapsed > 0:
+                instantaneous = (self.progress - self._last_update_progress) / elapsed
+                # Smooth with an exponential moving average so the displayed
+                # rate doesn't jump around; the first sample seeds it directly
+                if self._rate == 0.0:
+                    self._rate = instantaneous
+                else:
+                    self._rate += RATE_SMOOTHING * (instantaneous - self._rate)
+        self._last_update_progress = self.progress
 
-        if (
-            now - self._last_update_time >= self._minimum_interval
-            or self.progress >= self.total
-        ):
-            self.update_rate(now)
-            await self.draw()
-            self._last_update_time = now
+        self.draw(now)
+        self._last_update_time = now
+        self._next_update_deadline = now + self._minimum_interval
 
         if self.progress >= self.total:
-            await self.finish()
+            self.finish()
+
+    async def redraw_periodically(self) -> None:
+        """Redraw every minimum interval until the bar completes."""
+        while not self._finished:
+            await asyncio.sleep(self._minimum_interval)
+            self.redraw()
+
     @property
     def elapsed(self) -> float:
         """Get the elapsed time in seconds since the start of the progress bar."""
         if self._start_time is None:
             return 0.0
-        return time.time() - self._start_time
+        return time.monotonic() - self._start_time
 
     @property
     def remaining(self) -> float:
@@ -92,21 +384,23 @@ class BaseProgressBar:
         remaining_items = self.total - self.progress
         return remaining_items / self._rate if self._rate > 0 else 0.0
 
-    def update_rate(self, now: float):
-        """Update the rate monitor if minimum interval has passed."""
-        elapsed = now - self._last_update_time
-        progress_delta = self.progress - self._last_update_progress
-        self._rate = progress_delta / elapsed if elapsed > 0 else 0.0
-        self._last_update_progress = self.progress
+    @abstractmethod
+    def draw(self, now: float | None = None) -> None:
+        """
+        Render the current progress.
 
-    async def draw(self) -> None:
-        raise NotImplementedError
+        `now` is the `time.monotonic()` timestamp `redraw` already took for
+        this frame, so implementations needn't read the clock again; it is
+        None when called directly, and they then sample the clock themselves.
+        """
 
-    async def finish(self) -> None:
-        raise NotImplementedError
+    @abstractmethod
+    def finish(self) -> None:
+        """Finalize the display once the bar is complete; later calls do nothing."""
 
-    async def reset(self) -> None:
-        raise NotImplementedError
+    @abstractmethod
+    def reset(self) -> None:
+        """Return the bar to zero progress and redraw it."""
 
     @property
     def rate(self) -> float:
@@ -124,13 +418,36 @@ class BaseProgressBar:
 
     @staticmethod
     def format_time(seconds: float) -> str:
-        minutes = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{minutes:02d}:{secs:02d}"
+        # The display only changes once a second, so cache by whole seconds;
+        # negative durations (e.g. remaining time after overshooting) show 00:00
+        return _format_whole_seconds(max(0, int(seconds)))
+
 
 class TerminalProgressBar(BaseProgressBar):
-    terminal_bar_count: int = 0
+    __slots__ = (
+        "fill",
+        "decimals",
+        "bar_length",
+        "_inv_total",
+        "_fill_width",
+        "_dash_offset",
+        "_bar_template",
+        "_format_middle",
+        "_bar_line",
+        "_head",
+        "_down_seq",
+        "_last_frame",
+        "_head_offset",
+        "_tail",
+        "_reserved_done",
+    )
+
     lines_reserved: bool = False
+    # Number of terminal bars created so far. Bars only need to know how many
+    # lines were handed out after theirs, so no references to them are kept
+    terminal_bar_count: int = 0
+    # Guards terminal_bar_count and lines_reserved; bars may come from threads
+    _reserve_lock: threading.Lock = threading.Lock()
 
     def __init__(
         self,
@@ -144,57 +461,143 @@ class TerminalProgressBar(BaseProgressBar):
     ):
         super().__init__(total, leave, prefix, suffix, minimum_interval, unit)
         self.fill: str = fill
-        term_size = shutil.get_terminal_size()
-        reserved = len(prefix) + len(suffix) + len(str(total)) + 40
-        self.bar_length: int = max(10, term_size.columns - reserved)
+        term_size = get_terminal_size()
         self.decimals: int = 1
-        self._bar_line: int = TerminalProgressBar.terminal_bar_count
-        TerminalProgressBar.terminal_bar_count += 1
+        # Leave room for the counters, timings, rate and "100.0% "
+        reserved = len(prefix) + len(suffix) + len(str(total)) + 46 + self.decimals
+        self.bar_length: int = max(10, term_size.columns - reserved)
+        self._inv_total: float = 1.0 / total
+        # Every possible bar is a window into these pre-encoded bytes, so
+        # draw() takes a zero-copy slice instead of building new strings
+        fill_bytes = fill.encode("utf-8")
+        self._fill_width: int = len(fill_bytes)
+        self._dash_offset: int = self._fill_width * self.bar_length
+        self._bar_template: memoryview = memoryview(
+            fill_bytes * self.bar_length + b"-" * self.bar_length
+        )
+        # Everything fixed for the bar's lifetime is baked into one format
+        # string, leaving only the live values to fill in per frame; printf
+        # style is used because it beats str.format for these simple specs
+        self._format_middle: Callable[[tuple[float, int, str, str, float]], str] = (
+            f"| %.{self.decimals}f%% %d/{total} %s<%s  (%.2f it/{unit})"
+        ).__mod__
+        with TerminalProgressBar._reserve_lock:
+            self._bar_line: int = TerminalProgressBar.terminal_bar_count
+            TerminalProgressBar.terminal_bar_count += 1
+        # Static pieces of the frame, built once instead of on every draw
+        self._head: bytes = b""
+        self._down_seq: bytes = b""
+        self._last_frame: bytes = b""
+        self._head_offset: int = -1
+        self._tail: bytes = (
+            f" {suffix}{CLEAR_LINE_FROM_CURSOR_TO_END}{RESTORE_CURSOR_POSITION}"
+        ).encode("utf-8")
+        self._reserved_done: bool = False
 
     @classmethod
     def reserve_lines(cls, num_bars: int | None = None):
         """Reserve lines in the terminal for multiple progress bars."""
-        if not cls.lines_reserved:
+        newlines = cls._claim_reserved_lines(num_bars)
+        if newlines:
+            write_frame(newlines)
+
+    @classmethod
+    def _claim_reserved_lines(cls, num_bars: int | None = None) -> bytes:
+        """The newlines that reserve our lines, or b"" if that already happened."""
+        # Bars may be drawn from worker threads too, so only one of them
+        # gets to print the reserved lines
+        with cls._reserve_lock:
+            if cls.lines_reserved:
+                return b""
             bars_to_reserve = (
                 num_bars if num_bars is not None else cls.terminal_bar_count
             )
-            if bars_to_reserve > 0:
-                print("\n" * bars_to_reserve, end="")
-                cls.lines_reserved = True
-
-    async def draw(self):
-        filled_length = int(self.bar_length * self.progress // self.total)
-        bar = self.fill * filled_length + "-" * (self.bar_length - filled_length)
-        rate_unit = f"it/{self.unit}"
-        rate_str = f" ({self.display_rate:.2f} {rate_unit})"
-        elapsed_str = BaseProgressBar.format_time(self.elapsed)
+            if bars_to_reserve <= 0:
+                return b""
+            cls.lines_reserved = True
+            return b"\n" * bars_to_reserve
+
+    def draw(self, now: float | None = None):
+        # Lines are reserved lazily by the first frame, which carries the
+        # newlines itself so reserving costs no extra write
+        reserve = b""
+        if not self._reserved_done:
+            reserve = TerminalProgressBar._claim_reserved_lines()
+            self._reserved_done = True
+        # Integer division for the fill, so a finished bar is always full even
+        # when progress * (1 / total) rounds to just below 1.0
+        filled_length = self.bar_length * self.progress // self.total
+        empty_length = self.bar_length - min(filled_length, self.bar_length)
+        bar = self._bar_template[
+            empty_length * self._fill_width : self._dash_offset + empty_length
+        ]
+        if now is None:
+            now = time.monotonic()
+        # Reuse the caller's timestamp rather than sampling the clock again
+        elapsed = now - self._start_time if self._start_time is not None else 0.0
+        elapsed_str = BaseProgressBar.format_time(elapsed)
         remaining_str = BaseProgressBar.format_time(self.remaining) if self.progress > 0 else "00:00"
 
-        sys.stdout.write(f"{SAVE_CURSOR_POSITION}")
-        sys.stdout.write(
-            f"{move_cursor_up_lines(TerminalProgressBar.terminal_bar_count - self._bar_line)}"
-        )
-        sys.stdout.write(
-            f"{MOVE_CURSOR_TO_LINE_START}{self.prefix} |{bar}| {self.progress}/{self.total} {elapsed_str}<{remaining_str} {rate_str} {self.suffix}{CLEAR_LINE_FROM_CURSOR_TO_END}"
-        )
-        sys.stdout.write(f"{RESTORE_CURSOR_POSITION}")
-        sys.stdout.flush()
-
-    async def finish(self):
-        sys.stdout.write(
-            f"{move_cursor_down_lines(TerminalProgressBar.terminal_bar_count - self._bar_line)}"
-        )
-        sys.stdout.flush()
-
-    async def reset(self):
+        if TerminalProgressBar.terminal_bar_count - self._bar_line != self._head_offset:
+            self._update_cursor_moves()
+
+        # Only the short ASCII middle is formatted and encoded per frame; the
+        # rest is pre-encoded, and the whole frame goes out in a single write
+        middle = self._format_middle(
+            (100.0 * self.progress * self._inv_total, self.progress, elapsed_str, remaining_str, self.display_rate)
+        ).encode("ascii")
+        frame = b"".join((self._head, bar, middle, self._tail))
+        # Nothing visible changed (e.g. a stalled bar), so spare the terminal
+        if frame == self._last_frame:
+            return
+        self._last_frame = frame
+        write_frame(reserve + frame)
+
+    def finish(self):
+        # Finishing twice, e.g. explicitly after the final update, would move
+        # the cursor down past the bars
+        if self._finished:
+            return
+        self._finished = True
+        if TerminalProgressBar.terminal_bar_count - self._bar_line != self._head_offset:
+            self._update_cursor_moves()
+        write_frame(self._down_seq)
+
+    def _update_cursor_moves(self) -> None:
+        """Rebuild the cached cursor moves; bars created later push ours up."""
+        offset = TerminalProgressBar.terminal_bar_count - self._bar_line
+        self._head = (
+            f"{SAVE_CURSOR_POSITION}{move_cursor_up_lines(offset)}"
+            f"{MOVE_CURSOR_TO_LINE_START}{self.prefix} |"
+        ).encode("utf-8")
+        self._down_seq = move_cursor_down_lines(offset).encode("ascii")
+        self._head_offset = offset
+
+    def reset(self):
         self.progress = 0
+        self._start_time = None
         self._last_update_time = 0.0
+        self._next_update_deadline = 0.0
+        self._finished = False
+        self._progress_since_check = 0
         self._last_update_progress = 0
         self._rate = 0.0
-        await self.draw()
+        self.draw()
 
 
 class NotebookProgressBar(BaseProgressBar):
+    __slots__ = (
+        "prefix_label",
+        "suffix_label",
+        "progress_bar",
+        "textbox",
+        "widget",
+        "_last_text",
+        "_pending_value",
+        "_last_commit_time",
+        "_commit_handle",
+    )
+
     def __init__(
         self,
         total: int,
@@ -204,55 +607,101 @@ class NotebookProgressBar(BaseProgressBar):
         minimum_interval: float = 0.01,
         unit: Literal["s", "min"] = "s",
     ):
-        # We keep ipywidgets and ipython imports here to
-        # allow usage of the library without them
-        from ipywidgets import IntProgress, Label, HBox
-        from IPython.display import display
+        int_progress, label, hbox, display = load_ipywidgets()
 
         super().__init__(total, leave, prefix, suffix, minimum_interval, unit)
 
-        self.prefix_label: Label = Label(value=self.prefix)
-        self.suffix_label: Label = Label(value=self.suffix)
-        self.progress_bar: IntProgress = IntProgress(
+        self.prefix_label: Label = label(value=self.prefix)
+        self.suffix_label: Label = label(value=self.suffix)
+        self.progress_bar: IntProgress = int_progress(
             value=0,
             min=0,
             max=self.total,
         )
         rate_unit = f"it/{self.unit}"
-        self.textbox: Label = Label(
+        self.textbox: Label = label(
             value=f"{self.progress_bar.value} / {self.total} (0.00 {rate_unit})",
             style={'font_family': "'Fira Code', monospace"},
         )
-        self.widget: HBox = HBox([
+        self.widget: HBox = hbox([
             self.prefix_label,
             self.progress_bar,
             self.textbox,
             self.suffix_label,
         ])
+        self._last_text: str = ""
+        # Widget syncs are throttled separately from draws; see `draw`
+        self._pending_value: int = 0
+        self._last_commit_time: float = float("-inf")
+        self._commit_handle: asyncio.TimerHandle | None = None
         display(self.widget)
 
-    async def draw(self):
-        self.progress_bar.value = self.progress
-        elapsed_str = BaseProgressBar.format_time(self.elapsed)
+    def draw(self, now: float | None = None):
+        if now is None:
+            now = time.monotonic()
+        # Reuse the caller's timestamp rather than sampling the clock again
+        elapsed = now - self._start_time if self._start_time is not None else 0.0
+        elapsed_str = BaseProgressBar.format_time(elapsed)
         remaining_str = BaseProgressBar.format_time(self.remaining) if self.progress > 0 else "00:00"
         rate_unit = f"it/{self.unit}"
-        self.textbox.value = (
-            f"{self.progress_bar.value}/{self.total} {elapsed_str}<{remaining_str} ({self.display_rate:.2f} {rate_unit})"
+        # Each assignment is a comm message to the frontend, so format first
+        # and touch each widget exactly once per draw
+        text = (
+            f"{self.progress}/{self.total} {elapsed_str}<{remaining_str} ({self.display_rate:.2f} {rate_unit})"
         )
-
-    async def finish(self):
+        if text == self._last_text:
+            return
+        self._last_text = text
+        self._pending_value = self.progress
+        wait = self._last_commit_time + WIDGET_SYNC_INTERVAL - now
+        if wait <= 0 or self.progress >= self.total:
+            # Commit inline whenever the interval is up: a synchronous or
+            # CPU-bound cell never yields, so a scheduled commit wouldn't run
+            self._commit(now)
+            return
+        if self._commit_handle is not None:
+            # The scheduled commit will pick up the latest values
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._commit(now)
+        else:
+            # Only flushes the trailing value if no later draw commits first
+            self._commit_handle = loop.call_later(wait, self._commit)
+
+    def _commit(self, now: float | None = None) -> None:
+        """Send the latest drawn values to the frontend."""
+        if self._commit_handle is not None:
+            self._commit_handle.cancel()
+            self._commit_handle = None
+        self._last_commit_time = time.monotonic() if now is None else now
+        self.progress_bar.value = self._pending_value
+        self.textbox.value = self._last_text
+
+    def finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        if self._commit_handle is not None:
+            self._commit()
         if not self.leave:
             self.widget.close()
 
-    async def reset(self):
+    def reset(self):
+        if self._commit_handle is not None:
+            self._commit_handle.cancel()
+            self._commit_handle = None
         self.widget.open()
         self.progress = 0
+        self._start_time = None
         self._last_update_time = 0.0
+        self._next_update_deadline = 0.0
+        self._finished = False
+        self._progress_since_check = 0
         self._last_update_progress = 0
         self._rate = 0.0
-        self.progress_bar.value = 0
-        self.textbox.value = f"0 / {self.total} (0.00 it/s)"
-        await self.draw()
+        self.draw()
 
 
 class AsyncProgressBar:
@@ -261,9 +710,13 @@ class AsyncProgressBar:
 
     This class provides a unified async progress bar interface for both terminal and Jupyter environments.
     It automatically selects the appropriate implementation based on the environment.
+
+    Updating never awaits, so `update` and `tick` can also be called from
+    synchronous code; `draw`, `finish` and `reset` stay awaitable.
     """
 
     _impl: NotebookProgressBar | TerminalProgressBar
+    _drawer: asyncio.Task[None] | None = None
 
     def __init__(
         self,
@@ -306,39 +759,94 @@ class AsyncProgressBar:
                 unit,
             )
 
-    async def update(self, progress: int = 1):
+    def update(self, progress: int = 1) -> Awaitable[None]:
         """
         Update the progress bar by a given amount.
 
         Args:
             progress (int, optional): Amount to increment the progress. Defaults to 1.
         """
-        await self._impl.update(progress)
+        return self._impl.update(progress)
+
+    async def aupdate(self, progress: int = 1) -> None:
+        """
+        Update the progress bar by a given amount, as a coroutine.
+
+        `update` returns a bare awaitable rather than a coroutine, so use this
+        when the call must be passed to `asyncio.create_task` or `asyncio.gather`.
+
+        Args:
+            progress (int, optional): Amount to increment the progress. Defaults to 1.
+        """
+        await self._impl.aupdate(progress)
+
+    def tick(self, progress: int = 1) -> bool:
+        """
+        Advance the progress bar without drawing.
+
+        Args:
+            progress (int, optional): Amount to increment the progress. Defaults to 1.
+
+        Returns:
+            bool: True if a redraw is due; call `await draw()` to draw it.
+        """
+        return self._impl.tick(progress)
+
+    def start(self) -> None:
+        """
+        Start a background task that redraws the bar every `minimum_interval`.
+
+        While it runs, progress can be counted with `tick`, which never awaits.
+        The task ends on its own once the bar completes; `aclose` stops it early.
+        Using the bar as an async context manager calls both for you.
+        """
+        if self._drawer is None:
+            self._drawer = asyncio.ensure_future(self._impl.redraw_periodically())
+
+    async def aclose(self):
+        """
+        Stop the background redraw task and draw the current progress.
+        """
+        drawer, self._drawer = self._drawer, None
+        if drawer is None:
+            return
+        drawer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await drawer
+        self._impl.redraw()
+
+    async def __aenter__(self) -> AsyncProgressBar:
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
 
     async def draw(self):
         """
         Redraw the progress bar (force update of the display).
         """
-        await self._impl.draw()
+        self._impl.redraw()
 
     async def finish(self):
         """
         Mark the progress bar as finished (finalize display).
         """
-        await self._impl.finish()
+        self._impl.finish()
 
     async def reset(self):
         """
         Reset the progress bar to its initial state.
         """
-        await self._impl.reset()
+        self._impl.reset()
 
 
 if __name__ == "__main__":
     import aiolimiter
 
     number_of_requests = 10000
-    rate_limiter = aiolimiter.AsyncLimiter(3000, 1)
+    max_in_flight = 3000
+    rate_limiter = aiolimiter.AsyncLimiter(max_in_flight, 1)
     progressbar1 = AsyncProgressBar(number_of_requests)
     progressbar2 = AsyncProgressBar(number_of_requests, unit="s")
 
@@ -349,11 +857,18 @@ if __name__ == "__main__":
             await progressbar2.update(1)
             return i
 
+    async def worker(ids: Iterator[int]):
+        # Workers share one iterator, so each request id is handed out once
+        for i in ids:
+            await request(i)
+
     async def main():
-        requests = [request(i) for i in range(number_of_requests)]
-        await asyncio.gather(*requests)
+        # A fixed pool of workers keeps only as many requests alive as the
+        # limiter lets through, instead of a task for every request
+        ids = iter(range(number_of_requests))
+        await asyncio.gather(*(worker(ids) for _ in range(max_in_flight)))
 
     print("Let's test the async progressbar!")
-    t1 = time.time()
+    t1 = time.monotonic()
     asyncio.run(main())
-    print(f"Total time: {time.time() - t1:.2f} seconds")
+    print(f"Total time: {time.monotonic() - t1:.2f} seconds")
@@ -1,60 +1,57 @@
-import sys
+import asyncio
+import io
+import types
 from io import StringIO
 import pytest
 from unittest.mock import patch, MagicMock
 
-from async_progressbar import TerminalProgressBar, NotebookProgressBar, AsyncProgressBar, use_ipywidgets_progressbar
+import async_progressbar
+from async_progressbar import (
+    TerminalProgressBar, NotebookProgressBar, AsyncProgressBar, hold_frames,
+    move_cursor_down_lines, move_cursor_up_lines, use_ipywidgets_progressbar,
+    write_frame,
+)
 
-@pytest.fixture(autouse=True)
+@pytest.fixture
 def reset_terminal_progress_bar_state():
     """Resets the class-level state of TerminalProgressBar before each test."""
     TerminalProgressBar.terminal_bar_count = 0
     TerminalProgressBar.lines_reserved = False
 
 @pytest.mark.asyncio
-async def test_terminal_progress_bar_creation():
+async def test_terminal_progress_bar_creation(reset_terminal_progress_bar_state):
     """Tests the creation of a TerminalProgressBar."""
     bar = TerminalProgressBar(total=100)
     assert bar.total == 100
     assert bar.progress == 0
 
 @pytest.mark.asyncio
-async def test_terminal_progress_bar_update_and_draw():
+async def test_terminal_progress_bar_update_and_draw(reset_terminal_progress_bar_state, capsys):
     """Tests that the terminal progress bar updates and draws correctly."""
     bar = TerminalProgressBar(total=100, prefix="Test:")
-    
-    # Redirect stdout to capture the output of the draw method
-    old_stdout = sys.stdout
-    sys.stdout = captured_output = StringIO()
-    
+
     await bar.update(10)
-    
-    # Restore stdout
-    sys.stdout = old_stdout
-    
-    output = captured_output.getvalue()
+
+    output = capsys.readouterr().out
     # Check that the prefix and percentage are in the output
     assert "Test:" in output
     assert "10.0%" in output
 
 @pytest.mark.asyncio
-async def test_two_terminal_progress_bars():
+async def test_two_terminal_progress_bars(reset_terminal_progress_bar_state, capsys):
     """Tests the behavior of two simultaneous terminal progress bars."""
     bar1 = TerminalProgressBar(total=100, prefix="Bar1:")
     bar2 = TerminalProgressBar(total=100, prefix="Bar2:")
 
-    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
-        # Manually reserve lines to simulate the terminal environment
-        # Update first bar
-        await bar1.update(10)
-        output1 = mock_stdout.getvalue()
+    # Update first bar
+    await bar1.update(10)
+    output1 = capsys.readouterr().out
 
-        # Update second bar
-        await bar2.update(20)
-        output2 = mock_stdout.getvalue()
+    # Update second bar; readouterr() consumes, so keep the earlier output
+    await bar2.update(20)
+    output2 = output1 + capsys.readouterr().out
 
     # Check that the first bar's update moves the cursor up two lines
-    from async_progressbar import move_cursor_up_lines
     assert move_cursor_up_lines(2) in output1
     assert "Bar1:" in output1
     assert "10.0%" in output1
@@ -69,38 +66,33 @@ async def test_two_terminal_progress_bars():
 
 
 @pytest.mark.asyncio
-async def test_terminal_progress_bar_finish_output():
+async def test_terminal_progress_bar_finish_output(reset_terminal_progress_bar_state, capsys):
     """Tests that the output of a finished progress bar is a single newline."""
     bar = TerminalProgressBar(total=100)
-    # Mock stdout to capture output
-    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
-        # Manually reserve lines to avoid initial newlines in output
-        TerminalProgressBar.reserve_lines(1)
-        # Reset buffer to ignore reservation output
-        mock_stdout.seek(0)
-        mock_stdout.truncate()
-
-        await bar.finish()
-        output = mock_stdout.getvalue()
+    # Lines are only reserved by the first frame, so finishing writes nothing else
+    bar.finish()
+    output = capsys.readouterr().out
 
     # The finish method should move the cursor down one line.
     # This corresponds to a single newline character if we interpret ANSI codes.
     # Or more simply, we check the raw output.
-    from async_progressbar import move_cursor_down_lines
     assert output == move_cursor_down_lines(1)
 
 @pytest.mark.asyncio
-async def test_terminal_progress_bar_finish():
-    """Tests that the progress bar reaches 100% when finished."""
+async def test_terminal_progress_bar_finish(reset_terminal_progress_bar_state, capsys):
+    """Tests that the progress bar reaches 100% and finishes exactly once."""
     bar = TerminalProgressBar(total=100)
-    # Mock stdout to avoid printing during tests
-    with patch('sys.stdout', new_callable=StringIO):
-        await bar.update(100)
+    await bar.update(100)
+    # The final update already finished the bar; explicit calls change nothing
+    bar.finish()
+    bar.finish()
     assert bar.progress >= bar.total
+    assert capsys.readouterr().out.count(move_cursor_down_lines(1)) == 1
 
 # Mocking ipywidgets for NotebookProgressBar tests
 # This allows testing the notebook progress bar without a real Jupyter environment
-class MockFloatProgress:
+class MockIntProgress:
+    __slots__ = ('value', 'max')
     def __init__(self, *args, **kwargs):
         self.value = 0
         self.max = kwargs.get('max', 100)
@@ -110,10 +102,12 @@ class MockFloatProgress:
         pass
 
 class MockLabel:
+    __slots__ = ('value',)
     def __init__(self, *args, **kwargs):
         self.value = ""
 
 class MockHBox:
+    __slots__ = ()
     def __init__(self, *args, **kwargs):
         pass
     def close(self):
@@ -121,54 +115,297 @@ class MockHBox:
     def open(self):
         pass
 
-mock_ipywidgets = {
-    'FloatProgress': MockFloatProgress,
-    'Label': MockLabel,
-    'HBox': MockHBox,
+# Plain namespaces rather than MagicMocks, so attribute lookups are ordinary;
+# `from ... import` only needs the names to exist on the sys.modules entry
+mock_ipywidgets = types.SimpleNamespace(
+    IntProgress=MockIntProgress, Label=MockLabel, HBox=MockHBox,
+)
+mock_ipython_display = types.SimpleNamespace(display=lambda *args, **kwargs: None)
+mock_getipython = types.SimpleNamespace(get_ipython=lambda: None)
+
+mock_notebook_modules = {
+    'ipywidgets': mock_ipywidgets,
+    'IPython.display': mock_ipython_display,
+    'IPython.core.getipython': mock_getipython,
 }
 
+@pytest.fixture
+def fake_notebook_env():
+    """Installs the fake notebook modules and forgets any cached widget classes."""
+    with patch.dict('sys.modules', mock_notebook_modules), \
+            patch('async_progressbar._ipywidgets', None):
+        yield
+
 @pytest.mark.asyncio
-@patch.dict('sys.modules', {'ipywidgets': MagicMock(**mock_ipywidgets), 'IPython.display': MagicMock(), 'IPython.core.getipython': MagicMock()})
-async def test_notebook_progress_bar_creation():
+async def test_notebook_progress_bar_creation(fake_notebook_env):
     """Tests the creation of a NotebookProgressBar."""
-    from ipywidgets import FloatProgress
+    from ipywidgets import IntProgress
     
     bar = NotebookProgressBar(total=100)
     assert bar.total == 100
-    assert isinstance(bar.progress_bar, FloatProgress)
+    assert isinstance(bar.progress_bar, IntProgress)
 
 @pytest.mark.asyncio
-@patch.dict('sys.modules', {'ipywidgets': MagicMock(**mock_ipywidgets), 'IPython.display': MagicMock(), 'IPython.core.getipython': MagicMock()})
-async def test_notebook_progress_bar_update():
+async def test_notebook_progress_bar_update(fake_notebook_env):
     """Tests that the notebook progress bar updates its value correctly."""
     bar = NotebookProgressBar(total=100)
     await bar.update(25)
     assert bar.progress == 25
     assert bar.progress_bar.value == 25
 
-def test_use_ipywidgets_progressbar_in_terminal():
-    """Tests that the environment check correctly identifies a terminal."""
-    with patch('IPython.core.getipython.get_ipython', side_effect=NameError):
-        assert not use_ipywidgets_progressbar()
+@pytest.mark.asyncio
+async def test_notebook_progress_bar_coalesces_widget_syncs(fake_notebook_env):
+    """Tests that quick successive draws reach the widgets once, with the latest value."""
+    bar = NotebookProgressBar(total=100, minimum_interval=0)
+    await bar.update(10)
+    await bar.update(10)
+    await bar.update(10)
+    assert bar.progress_bar.value == 10
+    await asyncio.sleep(0.1)
+    assert bar.progress_bar.value == 30
+
+@pytest.mark.asyncio
+async def test_notebook_progress_bar_syncs_without_yielding(fake_notebook_env):
+    """Tests that draws past the sync interval reach the widgets even if the loop never runs."""
+    bar = NotebookProgressBar(total=100, minimum_interval=0)
+    for step in range(1, 4):
+        bar.progress = 10 * step
+        bar.draw(now=float(step))
+        assert bar.progress_bar.value == 10 * step
 
-def test_use_ipywidgets_progressbar_in_notebook():
-    """Tests that the environment check correctly identifies a notebook."""
-    mock_ipython = MagicMock()
-    mock_ipython.__class__.__name__ = 'ZMQInteractiveShell'
-    with patch('IPython.core.getipython.get_ipython', return_value=mock_ipython):
-        assert use_ipywidgets_progressbar()
+@pytest.fixture
+def fresh_environment_check():
+    """Runs the memoized environment check from scratch, without leaking the result."""
+    use_ipywidgets_progressbar.cache_clear()
+    yield
+    use_ipywidgets_progressbar.cache_clear()
+
+@pytest.mark.parametrize("get_ipython, expected", [
+    (MagicMock(side_effect=NameError), False),
+    (MagicMock(return_value=type('ZMQInteractiveShell', (), {})()), True),
+], ids=["terminal", "notebook"])
+def test_use_ipywidgets_progressbar(fresh_environment_check, get_ipython, expected):
+    """Tests that the environment check tells a terminal from a notebook."""
+    with patch('IPython.core.getipython.get_ipython', get_ipython):
+        assert use_ipywidgets_progressbar() is expected
 
 @pytest.mark.asyncio
-async def test_async_progress_bar_chooses_terminal():
+async def test_async_progress_bar_chooses_terminal(reset_terminal_progress_bar_state):
     """Tests that AsyncProgressBar chooses the terminal implementation."""
     with patch('async_progressbar.use_ipywidgets_progressbar', return_value=False):
         bar = AsyncProgressBar(total=100)
         assert isinstance(bar._impl, TerminalProgressBar)
 
 @pytest.mark.asyncio
-@patch.dict('sys.modules', {'ipywidgets': MagicMock(**mock_ipywidgets), 'IPython.display': MagicMock(), 'IPython.core.getipython': MagicMock()})
-async def test_async_progress_bar_chooses_notebook():
+async def test_async_progress_bar_chooses_notebook(fake_notebook_env):
     """Tests that AsyncProgressBar chooses the notebook implementation."""
     with patch('async_progressbar.use_ipywidgets_progressbar', return_value=True):
         bar = AsyncProgressBar(total=100)
         assert isinstance(bar._impl, NotebookProgressBar)
+
+def test_terminal_progress_bar_tick_is_throttled(reset_terminal_progress_bar_state):
+    """Tests that tick only reports a redraw once the interval has elapsed."""
+    bar = TerminalProgressBar(total=100, minimum_interval=60)
+    assert bar.tick(1)
+    bar._next_update_deadline = float("inf")
+    assert not bar.tick(1)
+    assert bar.progress == 2
+    # Completing the bar always asks for a final redraw
+    assert bar.tick(98)
+
+@pytest.mark.asyncio
+async def test_terminal_progress_bar_finishes_once(reset_terminal_progress_bar_state):
+    """Tests that updates past the total do not redraw or finish again."""
+    bar = TerminalProgressBar(total=10)
+    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        await bar.update(10)
+        output = mock_stdout.getvalue()
+        await bar.update(1)
+        await bar.update(1)
+        assert mock_stdout.getvalue() == output
+    assert bar.progress == 12
+
+@pytest.mark.asyncio
+async def test_async_progress_bar_background_drawer(reset_terminal_progress_bar_state):
+    """Tests that the background drawer redraws progress counted with tick."""
+    with patch('async_progressbar.use_ipywidgets_progressbar', return_value=False):
+        bar = AsyncProgressBar(total=10, prefix="Bg:", minimum_interval=0.001)
+    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        async with bar:
+            bar.tick(5)
+            await asyncio.sleep(0.01)
+            assert "5/10" in mock_stdout.getvalue()
+            bar.tick(5)
+        output = mock_stdout.getvalue()
+    assert "10/10" in output
+    assert bar._drawer is None
+
+def test_tick_checks_clock_every_n_items(reset_terminal_progress_bar_state):
+    """Tests that large bars only consult the clock every total // 1000 items."""
+    bar = TerminalProgressBar(total=10_000)
+    with patch('async_progressbar.time.monotonic', return_value=1e9) as monotonic:
+        for _ in range(9):
+            assert not bar.tick(1)
+        assert bar.tick(1)
+    assert monotonic.call_count == 1
+
+@pytest.mark.asyncio
+async def test_terminal_progress_bar_head_follows_new_bars(reset_terminal_progress_bar_state):
+    """Tests that the cached cursor-up sequence is rebuilt when a bar is added."""
+    bar1 = TerminalProgressBar(total=100)
+    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        bar1.draw()
+        assert move_cursor_up_lines(1) in mock_stdout.getvalue()
+        TerminalProgressBar(total=100)
+        mock_stdout.seek(0)
+        mock_stdout.truncate()
+        bar1.draw()
+        assert move_cursor_up_lines(2) in mock_stdout.getvalue()
+
+@pytest.mark.parametrize("total, progress", [
+    (100, 0), (100, 1), (100, 50), (100, 100), (100, 150),
+    # 49 * (1 / 49) is just below 1.0 in floating point
+    (49, 49),
+])
+def test_terminal_progress_bar_template_slice(reset_terminal_progress_bar_state, total, progress):
+    """Tests that the bar sliced from the template has the right fill."""
+    bar = TerminalProgressBar(total=total, fill="█")
+    bar.progress = progress
+    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        bar.draw()
+    filled = min(bar.bar_length * progress // total, bar.bar_length)
+    if progress >= total:
+        assert filled == bar.bar_length
+    expected = "|" + "█" * filled + "-" * (bar.bar_length - filled) + "|"
+    assert expected in mock_stdout.getvalue()
+
+def test_terminal_progress_bar_skips_identical_frames(reset_terminal_progress_bar_state):
+    """Tests that redrawing an unchanged bar writes nothing."""
+    bar = TerminalProgressBar(total=100)
+    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        bar.draw(now=0.0)
+        output = mock_stdout.getvalue()
+        bar.draw(now=0.0)
+        assert mock_stdout.getvalue() == output
+        bar.progress = 1
+        bar.draw(now=0.0)
+        assert mock_stdout.getvalue() != output
+
+@pytest.mark.asyncio
+async def test_hold_frames_coalesces_bars(reset_terminal_progress_bar_state):
+    """Tests that frames from several bars drawn in hold_frames share one write."""
+    bar1 = TerminalProgressBar(total=100, prefix="Bar1:")
+    bar2 = TerminalProgressBar(total=100, prefix="Bar2:")
+    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        TerminalProgressBar.reserve_lines()
+        mock_stdout.seek(0)
+        mock_stdout.truncate()
+        with patch.object(mock_stdout, 'write', wraps=mock_stdout.write) as write:
+            with hold_frames():
+                await bar1.update(10)
+                await bar2.update(20)
+                assert mock_stdout.getvalue() == ""
+            write.assert_called_once()
+        output = mock_stdout.getvalue()
+    assert "Bar1:" in output
+    assert "Bar2:" in output
+
+def test_rate_is_smoothed(reset_terminal_progress_bar_state):
+    """Tests that the rate is seeded by the first sample and then smoothed."""
+    bar = TerminalProgressBar(total=1000)
+    with patch('sys.stdout', new_callable=StringIO), patch('async_progressbar.time.monotonic') as monotonic:
+        monotonic.return_value = 0.0
+        bar.redraw()
+        monotonic.return_value = 1.0
+        bar.progress = 10
+        bar.redraw()
+        assert bar.rate == pytest.approx(10.0)
+        monotonic.return_value = 2.0
+        bar.progress = 40
+        bar.redraw()
+    assert bar.rate == pytest.approx(12.0)
+
+def test_terminal_progress_bar_reserves_lines_on_first_draw(reset_terminal_progress_bar_state):
+    """Tests that lines are reserved once, by the first frame drawn."""
+    bar1 = TerminalProgressBar(total=100)
+    bar2 = TerminalProgressBar(total=100)
+    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        assert not TerminalProgressBar.lines_reserved
+        with patch.object(mock_stdout, 'write', wraps=mock_stdout.write) as write:
+            bar1.draw()
+            # The newlines ride along with the first frame instead of a write of their own
+            write.assert_called_once()
+        bar2.draw()
+        output = mock_stdout.getvalue()
+    assert TerminalProgressBar.lines_reserved
+    assert output.startswith("\n\n" + async_progressbar.SAVE_CURSOR_POSITION)
+    assert output.count("\n") == 2
+
+def test_write_frame_uses_fd_only_for_plain_files(tmp_path):
+    """Tests that frames bypass the io layers only when stdout wraps a plain FileIO."""
+    with open(tmp_path / "out", "w", encoding="utf-8") as stream:
+        assert async_progressbar._utf8_fileno(stream) == stream.fileno()
+    # Like the Windows console, a transcoding raw layer must go through write()
+    wrapped = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    assert async_progressbar._utf8_fileno(wrapped) == -1
+
+def test_write_frame_survives_nonblocking_stdout(tmp_path):
+    """Tests that a full non-blocking stdout queues the frame instead of raising."""
+    with open(tmp_path / "out", "w", encoding="utf-8") as stream:
+        with patch('sys.stdout', stream), \
+                patch('async_progressbar.os.write', side_effect=BlockingIOError):
+            write_frame("█".encode("utf-8"))
+    assert (tmp_path / "out").read_text(encoding="utf-8") == "█"
+
+@pytest.mark.asyncio
+async def test_hold_frames_only_holds_the_current_task(reset_terminal_progress_bar_state):
+    """Tests that a task holding frames does not delay frames drawn by other tasks."""
+    bar1 = TerminalProgressBar(total=100, prefix="Bar1:")
+    bar2 = TerminalProgressBar(total=100, prefix="Bar2:")
+    drawn = asyncio.Event()
+    release = asyncio.Event()
+
+    async def holder():
+        with hold_frames():
+            bar1.draw()
+            drawn.set()
+            await release.wait()
+
+    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        task = asyncio.create_task(holder())
+        await drawn.wait()
+        bar2.draw()
+        assert "Bar2:" in mock_stdout.getvalue()
+        assert "Bar1:" not in mock_stdout.getvalue()
+        release.set()
+        await task
+        assert "Bar1:" in mock_stdout.getvalue()
+
+@pytest.mark.parametrize("seconds, expected", [
+    (0, "00:00"), (59.9, "00:59"), (61, "01:01"), (-0.5, "00:00"), (-75, "00:00"),
+])
+def test_format_time(seconds, expected):
+    """Tests that durations render as MM:SS, with negative ones clamped to zero."""
+    assert TerminalProgressBar.format_time(seconds) == expected
+
+@pytest.mark.asyncio
+async def test_async_progress_bar_aupdate_is_a_coroutine(reset_terminal_progress_bar_state):
+    """Tests that aupdate can be scheduled where update's bare awaitable cannot."""
+    with patch('async_progressbar.use_ipywidgets_progressbar', return_value=False):
+        bar = AsyncProgressBar(total=10)
+    with patch('sys.stdout', new_callable=StringIO):
+        await asyncio.gather(bar.aupdate(4), asyncio.create_task(bar.aupdate(6)))
+    assert bar._impl.progress == 10
+
+def test_write_frame_does_not_keep_stdout_alive():
+    """Tests that the cached stdout descriptor doesn't pin a replaced stream."""
+    import gc
+    import weakref
+    stream = StringIO()
+    with patch('sys.stdout', stream):
+        write_frame(b"frame")
+    assert stream.getvalue() == "frame"
+    ref = weakref.ref(stream)
+    del stream
+    gc.collect()
+    assert ref() is None